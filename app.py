@@ -1,11 +1,17 @@
 import streamlit as st
 import pandas as pd
-from geopy.geocoders import ArcGIS, Nominatim
-from geopy.distance import geodesic
+import numpy as np
+import hashlib
+import io
+import os
+import tempfile
 import pydeck as pdk
 import requests
 from streamlit_js_eval import get_geolocation
 import random
+import re
+import unicodedata
+from functools import lru_cache
 import urllib.parse
 import extra_streamlit_components as stx
 
@@ -21,19 +27,24 @@ st.set_page_config(page_title="Buscador de Cafés", page_icon="☕", layout="wid
 # ==========================================
 cookie_manager = stx.CookieManager()
 
-favs_guardados = cookie_manager.get(cookie="cafes_favoritos")
-
-if favs_guardados is None:
-    favs_iniciales = []
+# Una vez leída la cookie, los favoritos viven en session_state y no se vuelven a parsear en cada rerun.
+# Mientras el componente todavía no respondió (None) seguimos consultando la cookie
+if "favoritos" in st.session_state:
+    favs_iniciales = st.session_state.favoritos
 else:
-    favs_iniciales = favs_guardados.split("||") if favs_guardados else []
+    favs_guardados = cookie_manager.get(cookie="cafes_favoritos")
+    
+    if favs_guardados is None:
+        favs_iniciales = []
+    else:
+        favs_iniciales = favs_guardados.split("||") if favs_guardados else []
+        st.session_state.favoritos = favs_iniciales
 
 
 # ==========================================
 # 3. CSS Y ESTILOS VISUALES
 # ==========================================
-st.markdown("""
-    <style>
+ESTILOS_CSS = """
     @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;600&display=swap');
     
     html, body, h1, h2, h3, h4, h5, h6, p, label, span, div { 
@@ -88,6 +99,14 @@ st.markdown("""
         justify-content: space-between;
         box-shadow: 0 2px 8px rgba(0,0,0,0.02);
     }
+    .tostador-grid {
+        display: grid;
+        grid-template-columns: repeat(3, 1fr);
+        gap: 1rem;
+    }
+    @media (max-width: 640px) {
+        .tostador-grid { grid-template-columns: 1fr; }
+    }
     .tostador-title { color: #4B3832; font-weight: 600; font-size: 1.15rem; margin-bottom: 5px; }
     .tostador-desc { font-size: 0.9rem; color: #85746D; margin-top: 8px; line-height: 1.4; }
     
@@ -120,8 +139,20 @@ st.markdown("""
         transition: background 0.3s;
     }
     .wpp-btn:hover { background: #128C7E; }
-    </style>
-""", unsafe_allow_html=True)
+"""
+
+
+@st.cache_resource
+def estilos_minificados():
+    # El <style> se vuelve a mandar en cada rerun (si no se manda, Streamlit lo saca de la página),
+    # así que lo achicamos una sola vez: sin comentarios ni espacios sobrantes
+    css = re.sub(r"/\*.*?\*/", "", ESTILOS_CSS, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};,])\s*", r"\1", css)
+    return f"<style>{css.strip()}</style>"
+
+
+st.markdown(estilos_minificados(), unsafe_allow_html=True)
 
 
 # ==========================================
@@ -144,6 +175,39 @@ GID_TOSTADORES = "1590442133"
 # Identificador de la nueva hoja: Top 100 Sudamérica
 GID_TOP_SUDAMERICA = "35250567" 
 
+# Columnas que realmente usa la app de cada hoja (el resto ni se parsea)
+COLUMNAS_CAFES = ["CAFE", "UBICACION", "INSTAGRAM", "LAT", "LONG"]
+COLUMNAS_TOP = COLUMNAS_CAFES + ["CIUDAD"]
+COLUMNAS_TOSTADORES = ["TOSTADOR", "CIUDAD", "INSTAGRAM", "TIENDA ONLINE"]
+
+# Radio fijo para el botón "Recomendar café" (~5 cuadras)
+RADIO_RECOMENDACION_KM = 0.5
+
+# Largo de una cuadra en metros (en Mar del Plata las cuadras son más cortas)
+METROS_POR_CUADRA = {"Mar del Plata": 87}
+METROS_POR_CUADRA_DEFAULT = 100
+
+# Máximo de locales que mostramos en la tabla y el mapa de una búsqueda por radio
+MAX_RESULTADOS = 200
+
+# Radio medio de la Tierra (km) para la fórmula de haversine
+RADIO_TIERRA_KM = 6371.0088
+
+# Kilómetros mínimos por grado de latitud (en el ecuador): usarlo como divisor nunca achica la franja.
+# Para la longitud usamos el mismo valor multiplicado por cos(lat)
+KM_POR_GRADO = 110.57
+
+# Base de los links "Abrir en mapa"
+URL_MAPS = "https://www.google.com/maps/search/?api=1&query="
+
+# Espacios repetidos (compilado una vez, se usa en cada normalización de texto)
+RE_ESPACIOS = re.compile(r"\s+")
+
+# Carpeta donde guardamos las hojas ya procesadas (Parquet) para no re-parsear el CSV.
+# Subir VERSION_CACHE cuando cambie el formato de lo que se guarda (tipos, limpieza)
+CACHE_DIR = os.path.join(tempfile.gettempdir(), "buscador_cafes")
+VERSION_CACHE = "4"
+
 
 # ==========================================
 # 5. CARGA DE DATOS (CACHÉ)
@@ -152,18 +216,92 @@ def sheet_url(gid: str) -> str:
     return f"https://docs.google.com/spreadsheets/d/{SPREADSHEET_ID}/gviz/tq?tqx=out:csv&gid={gid}"
 
 
+def columnas_de(nombres):
+    # Filtro para usecols: compara contra el título normalizado como lo hacemos después
+    return lambda col: col.upper().strip() in nombres
+
+
+def leer_csv(origen, columnas):
+    # Una sola pasada con el parser en C: Google exporta en UTF-8 y un byte roto se reemplaza
+    # en vez de tirar abajo la hoja entera
+    return pd.read_csv(
+        origen, 
+        dtype=str, 
+        usecols=columnas_de(columnas), 
+        engine="c", 
+        encoding="utf-8", 
+        encoding_errors="replace"
+    )
+
+
+def a_coordenada(serie):
+    # Todo vectorizado sobre la columna: espacios, coma decimal y pasaje a float32 en una sola cadena
+    limpia = serie.str.strip().str.replace(",", ".", regex=False)
+    return pd.to_numeric(limpia, errors="coerce", downcast="float")
+
+
+def ruta_cache_parquet(gid: str, contenido: bytes) -> str:
+    # La clave es (gid, hash del contenido): si la hoja no cambió, el Parquet sigue siendo válido.
+    # Sumamos versión y columnas pedidas para no reusar un Parquet armado de otra forma
+    firma = f"{VERSION_CACHE}|{','.join(COLUMNAS_CAFES)}".encode()
+    huella = hashlib.sha1(contenido + firma).hexdigest()[:16]
+    return os.path.join(CACHE_DIR, f"cafes_{gid}_{huella}.parquet")
+
+
+def guardar_cache_parquet(df, gid: str, ruta: str):
+    # Escribimos en un temporal y lo movemos de una vez: otro proceso nunca ve un Parquet a medio escribir.
+    # Después borramos los Parquet viejos de la misma hoja (versiones anteriores del contenido)
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    fd, temporal = tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+    os.close(fd)
+    try:
+        df.to_parquet(temporal, index=False)
+        os.replace(temporal, ruta)
+    except:
+        os.remove(temporal)
+        raise
+        
+    prefijo = f"cafes_{gid}_"
+    for nombre in os.listdir(CACHE_DIR):
+        viejo = os.path.join(CACHE_DIR, nombre)
+        if nombre.startswith(prefijo) and nombre.endswith(".parquet") and viejo != ruta:
+            try: os.remove(viejo)
+            except: pass
+
+
 @st.cache_data(ttl=300)
 def cargar_cafes(gid):
     try:
-        df = pd.read_csv(sheet_url(gid), dtype=str)
+        respuesta = requests.get(sheet_url(gid), timeout=15)
+        respuesta.raise_for_status()
+        contenido = respuesta.content
+        ruta = ruta_cache_parquet(gid, contenido)
+        
+        # Si ya procesamos exactamente esta versión de la hoja, leemos el Parquet directo.
+        # Un archivo dañado se borra y la hoja se vuelve a procesar desde el CSV
+        if os.path.exists(ruta):
+            try:
+                return pd.read_parquet(ruta)
+            except:
+                try: os.remove(ruta)
+                except: pass
+        
+        df = leer_csv(io.BytesIO(contenido), COLUMNAS_CAFES)
         df.columns = df.columns.str.upper().str.strip()
-        df["LAT"] = pd.to_numeric(df["LAT"].str.replace(",", "."), errors="coerce")
-        df["LONG"] = pd.to_numeric(df["LONG"].str.replace(",", "."), errors="coerce")
+        df["LAT"] = a_coordenada(df["LAT"])
+        df["LONG"] = a_coordenada(df["LONG"])
         
         if "INSTAGRAM" not in df.columns:
             df["INSTAGRAM"] = ""
             
-        return df.dropna(subset=["LAT", "LONG"])
+        df = df.dropna(subset=["LAT", "LONG"]).reset_index(drop=True)
+        
+        try:
+            guardar_cache_parquet(df, gid, ruta)
+        except: 
+            pass # Sin disco escribible seguimos igual, solo perdemos el atajo
+            
+        return df
     except: 
         return pd.DataFrame()
 
@@ -171,15 +309,15 @@ def cargar_cafes(gid):
 @st.cache_data(ttl=300)
 def cargar_top_sudamerica():
     # Eliminamos el try-except general para ver los errores de lectura de la tabla
-    df = pd.read_csv(sheet_url(GID_TOP_SUDAMERICA), dtype=str)
+    df = leer_csv(sheet_url(GID_TOP_SUDAMERICA), COLUMNAS_TOP)
     
     # 1. Limpiamos espacios invisibles en los títulos de las columnas
     df.columns = df.columns.str.upper().str.strip()
     
     # 2. Verificación y conversión de coordenadas
     if "LAT" in df.columns and "LONG" in df.columns:
-        df["LAT"] = pd.to_numeric(df["LAT"].str.replace(",", "."), errors="coerce")
-        df["LONG"] = pd.to_numeric(df["LONG"].str.replace(",", "."), errors="coerce")
+        df["LAT"] = a_coordenada(df["LAT"])
+        df["LONG"] = a_coordenada(df["LONG"])
     else:
         st.error("⚠️ Faltan las columnas 'LAT' o 'LONG' en la hoja Top.")
         return pd.DataFrame()
@@ -208,11 +346,33 @@ def cargar_top_sudamerica():
 @st.cache_data(ttl=300)
 def cargar_tostadores():
     try: 
-        df = pd.read_csv(sheet_url(GID_TOSTADORES), dtype=str).fillna("-")
+        df = leer_csv(sheet_url(GID_TOSTADORES), COLUMNAS_TOSTADORES).fillna("-")
         df.columns = df.columns.str.upper()
-        return df
     except: 
-        return pd.DataFrame()
+        df = pd.DataFrame(columns=COLUMNAS_TOSTADORES)
+        
+    if "TOSTADOR" not in df.columns:
+        df["TOSTADOR"] = "Desconocido"
+    if "CIUDAD" not in df.columns:
+        df["CIUDAD"] = "-"
+    if "TIENDA ONLINE" not in df.columns:
+        df["TIENDA ONLINE"] = "-"
+    if "INSTAGRAM" not in df.columns:
+        df["INSTAGRAM"] = "#"
+        
+    # Ciudad normalizada (minúsculas, sin tildes ni espacios de más) precalculada para el filtro de la pestaña
+    df["CIUDAD_NORM"] = df["CIUDAD"].fillna("").map(normalizar_texto)
+    return df
+
+
+@st.cache_data(ttl=300)
+def tostadores_de_ciudad(ciudad):
+    # El filtro sale de una lista fija de ciudades, así que cacheamos el resultado de cada una.
+    # Se mantiene la búsqueda por substring porque un tostador puede listar varias ciudades
+    df = cargar_tostadores()
+    if ciudad == "Todas":
+        return df
+    return df[df["CIUDAD_NORM"].str.contains(normalizar_texto(ciudad), regex=False)]
 
 
 @st.cache_data(ttl=300)
@@ -221,7 +381,7 @@ def cargar_todos_los_cafes():
     
     # 1. Cargamos las ciudades regulares
     for ciudad, gid in GID_CAFES.items():
-        df = cargar_cafes(gid).copy()
+        df = cargar_cafes(gid)
         if not df.empty:
             df["CIUDAD"] = ciudad
             df["ES_TOP"] = False
@@ -233,9 +393,69 @@ def cargar_todos_los_cafes():
         dfs.append(df_top)
         
     if dfs:
-        return pd.concat(dfs, ignore_index=True)
+        df = pd.concat(dfs, ignore_index=True)
+        
+        # Pocas ciudades distintas: como categoría los filtros == comparan códigos enteros
+        df["CIUDAD"] = df["CIUDAD"].astype("category")
+                
+        # Textos libres como strings de Arrow; los vacíos quedan en "" para no arrastrar <NA> a links y tarjetas
+        for col in ["CAFE", "UBICACION"]:
+            if col in df.columns:
+                df[col] = df[col].fillna("").astype("string[pyarrow]")
+                
+        # Dirección normalizada una sola vez por TTL, para el match local de buscar_coordenadas_inteligente
+        df["UBICACION_NORM"] = df["UBICACION"].map(normalizar_texto)
+        
+        # Huella del contenido: los índices de abajo se cachean por huella y no por su propio TTL
+        huella = int(pd.util.hash_pandas_object(df, index=False).sum())
+        return df, huella
         
-    return pd.DataFrame()
+    return pd.DataFrame(), 0
+
+
+@st.cache_resource(max_entries=2 * len(GID_CAFES))
+def indice_espacial(ciudad, huella, _df):
+    # Cafés de la ciudad + los TOP ordenados por LAT, con sus coordenadas como arrays de solo lectura.
+    # El índice conserva el orden de la tabla completa (ciudad antes que TOP, en orden de hoja)
+    df = _df[(_df["CIUDAD"] == ciudad) | (_df["ES_TOP"] == True)].sort_values("LAT", kind="stable")
+    lats = np.ascontiguousarray(df["LAT"].to_numpy())
+    lons = np.ascontiguousarray(df["LONG"].to_numpy())
+    lats.flags.writeable = False
+    lons.flags.writeable = False
+    return df, lats, lons
+
+
+@st.cache_resource(max_entries=2)
+def indice_ciudades(huella, _df):
+    # Posiciones de cada ciudad en la tabla completa: filtrar por ciudad es un iloc directo
+    return _df.groupby("CIUDAD", observed=True).indices
+
+
+@st.cache_data(max_entries=2)
+def ciudades_disponibles(huella, _df):
+    # Lista ordenada de ciudades para los filtros
+    if _df.empty:
+        return []
+    return sorted(_df["CIUDAD"].dropna().unique().tolist())
+
+
+@st.cache_data(max_entries=2)
+def opciones_filtro_ciudad(huella, _df):
+    texto_todas = f"Todas ({len(_df)})"
+    
+    opciones = [texto_todas]
+    mapa = {texto_todas: "Todas"}
+    
+    # Cantidad de cafés por ciudad
+    conteos = _df["CIUDAD"].value_counts()
+    
+    for c in ciudades_disponibles(huella, _df):
+        cantidad = int(conteos.get(c, 0))
+        texto_opcion = f"{c} ({cantidad})"
+        opciones.append(texto_opcion)
+        mapa[texto_opcion] = c
+        
+    return opciones, mapa
 
 
 # ==========================================
@@ -243,10 +463,13 @@ def cargar_todos_los_cafes():
 # ==========================================
 @st.cache_resource
 def get_geocoder(): 
+    # geopy se importa recién cuando hace falta geocodificar (no en el arranque en frío)
+    from geopy.geocoders import ArcGIS
     return ArcGIS(timeout=10)
 
 @st.cache_resource
 def get_osm_geocoder(): 
+    from geopy.geocoders import Nominatim
     return Nominatim(user_agent="cafes_app_arg_v6", timeout=10)
 
 def obtener_calle(lat, lon):
@@ -255,10 +478,70 @@ def obtener_calle(lat, lon):
     except: 
         return "Ubicación detectada"
 
+def cafes_en_radio(lats, lons, lat, lon, radio_km, limite=None):
+    # Franja de latitud (lats ordenado) + caja de longitud; con limite devuelve los más cercanos ordenados y el total
+    delta_lat = radio_km / KM_POR_GRADO
+    ini = np.searchsorted(lats, lat - delta_lat, side="left")
+    fin = np.searchsorted(lats, lat + delta_lat, side="right")
+    
+    # Franja vacía (lejos de los cafés cargados): cortamos antes de la trigonometría
+    if ini == fin:
+        posiciones, distancias = np.empty(0, dtype=np.intp), np.empty(0, dtype=lats.dtype)
+    else:
+        delta_lon = radio_km / (KM_POR_GRADO * np.cos(np.radians(lat)))
+        posiciones = ini + np.flatnonzero(np.abs(lons[ini:fin] - lon) <= delta_lon)
+        if posiciones.size == 0:
+            distancias = np.empty(0, dtype=lats.dtype)
+        else:
+            distancias = distancia_km(lat, lon, lats[posiciones], lons[posiciones])
+            dentro = distancias <= radio_km
+            posiciones, distancias = posiciones[dentro], distancias[dentro]
+    
+    if limite is None:
+        return posiciones, distancias
+    orden = np.argsort(distancias, kind="stable")[:limite]
+    return posiciones[orden], distancias[orden], len(posiciones)
+
+def distancia_km(lat, lon, lats, lons):
+    # Haversine vectorizado e in-place, en el dtype de las coordenadas (float32)
+    lats = np.asarray(lats)
+    lat1, lon1 = np.radians(np.asarray([lat, lon], dtype=lats.dtype))
+    lat2 = np.radians(lats)
+    
+    a = lat2 - lat1
+    a *= 0.5
+    np.sin(a, out=a)
+    np.square(a, out=a)
+    
+    dlon = np.radians(lons)
+    dlon -= lon1
+    dlon *= 0.5
+    np.sin(dlon, out=dlon)
+    np.square(dlon, out=dlon)
+    
+    np.cos(lat2, out=lat2)
+    dlon *= lat2
+    dlon *= np.cos(lat1)
+    a += dlon
+    
+    np.sqrt(a, out=a)
+    np.arcsin(a, out=a)
+    a *= 2 * RADIO_TIERRA_KM
+    return a
+
+@lru_cache(maxsize=8192)
+def normalizar_texto(texto):
+    # Minúsculas, sin tildes y con espacios simples: "Av. Colón  1500" -> "av. colon 1500".
+    # Función pura sobre strings, así que memoizarla hace gratis las repeticiones
+    sin_tildes = unicodedata.normalize("NFKD", texto).encode("ascii", "ignore").decode("ascii")
+    return RE_ESPACIOS.sub(" ", sin_tildes.strip().lower())
+
+def km_a_cuadras(ciudad):
+    # Factor km -> cuadras de la ciudad, para multiplicar arrays completos de una vez
+    return 1000.0 / METROS_POR_CUADRA.get(ciudad, METROS_POR_CUADRA_DEFAULT)
+
 def calcular_cuadras(km, ciudad):
-    metros = km * 1000
-    divisor = 87 if ciudad == "Mar del Plata" else 100
-    cuadras = int(metros / divisor)
+    cuadras = int(km * km_a_cuadras(ciudad))
     if cuadras == 0:
         return "A pasos"
     elif cuadras == 1:
@@ -266,20 +549,39 @@ def calcular_cuadras(km, ciudad):
     else:
         return f"{cuadras} cuadras"
 
-def buscar_coordenadas_inteligente(direccion, ciudad_sel, df_ciudad):
+def columna_cuadras(km, ciudad):
+    # Versión vectorizada de calcular_cuadras para una columna entera de distancias
+    cuadras = (np.asarray(km) * km_a_cuadras(ciudad)).astype(np.int32)
+    textos = np.char.add(cuadras.astype(str), " cuadras")
+    return np.where(cuadras == 0, "A pasos", np.where(cuadras == 1, "1 cuadra", textos))
+
+def buscar_coordenadas_inteligente(direccion, ciudad_sel, df_ciudad, direccion_norm=None):
     if not direccion or direccion.strip() == "":
         return None, None, None
         
     dir_limpia = direccion.strip().lower()
+    # Quien ya normalizó la dirección (la pestaña de cafés, para su memoria) la pasa y no se recalcula
+    if direccion_norm is None:
+        direccion_norm = normalizar_texto(direccion)
     
-    match_local = df_ciudad[df_ciudad["UBICACION"].str.lower().str.contains(dir_limpia, na=False)]
-    if not match_local.empty:
-        lat = match_local.iloc[0]["LAT"]
-        lon = match_local.iloc[0]["LONG"]
-        nom = match_local.iloc[0]["CAFE"]
-        ubi = match_local.iloc[0]["UBICACION"]
-        return lat, lon, f"{ubi} (Local: {nom})"
+    # Búsqueda literal sobre la dirección normalizada; gana el menor índice (la ciudad antes que los TOP)
+    coincide = df_ciudad["UBICACION_NORM"].str.contains(direccion_norm, regex=False).to_numpy()
+    if direccion_norm and coincide.any():
+        fila = df_ciudad.loc[df_ciudad.index[coincide].min()]
+        # float de Python: las coordenadas vienen en float32 y pydeck no las serializa como número
+        return float(fila["LAT"]), float(fila["LONG"]), f"{fila['UBICACION']} (Local: {fila['CAFE']})"
         
+    # Normalizamos espacios y mayúsculas para que "Av. Colón  1500" y "av. colón 1500" compartan caché
+    dir_normalizada = RE_ESPACIOS.sub(" ", dir_limpia)
+    try:
+        return geocodificar(dir_normalizada, ciudad_sel)
+    except LookupError:
+        return None, None, None
+
+@st.cache_data(ttl=86400, show_spinner=False)
+def geocodificar(direccion, ciudad_sel):
+    # Cacheado un día entre sesiones: repetir una dirección no vuelve a llamar a ArcGIS/OSM.
+    # Si no hay resultado levantamos LookupError para que un fallo (o un timeout) no quede cacheado
     variantes_busqueda = [
         f"{direccion}, {ciudad_sel}, Argentina",
         f"{direccion}, Buenos Aires, Argentina",
@@ -300,14 +602,132 @@ def buscar_coordenadas_inteligente(direccion, ciudad_sel, df_ciudad):
             if res: return res.latitude, res.longitude, res.address
         except: pass
         
-    return None, None, None
+    raise LookupError(direccion)
+
+def columna_maps(df):
+    # Mismo link que link_maps, para todas las filas
+    lat_txt = np.char.mod("%.6f", df["LAT"].to_numpy(dtype=np.float64))
+    lon_txt = np.char.mod("%.6f", df["LONG"].to_numpy(dtype=np.float64))
+    return np.char.add(np.char.add(np.char.add(URL_MAPS, lat_txt), ","), lon_txt)
+
+def puntos_mapa(df, mascara, columnas=("CAFE",)):
+    # Registros para pydeck de las filas de la máscara, con coordenadas a 6 decimales (~10 cm)
+    lat = np.round(df["LAT"].to_numpy(dtype=np.float64)[mascara], 6).tolist()
+    lon = np.round(df["LONG"].to_numpy(dtype=np.float64)[mascara], 6).tolist()
+    valores = [df[c].to_numpy(dtype=object, na_value=None)[mascara].tolist() for c in columnas]
+    claves = ("LAT", "LONG") + tuple(columnas)
+    return [dict(zip(claves, fila)) for fila in zip(lat, lon, *valores)]
+
+@st.cache_resource(max_entries=2)
+def puntos_mapa_federal(huella, _df):
+    # Registros del Mapa Federal armados una vez por versión de los datos, separados en normales y TOP
+    es_top = _df["ES_TOP"].to_numpy(dtype=bool)
+    return puntos_mapa(_df, ~es_top, ("CAFE", "CIUDAD")), puntos_mapa(_df, es_top, ("CAFE", "CIUDAD"))
+
+def link_maps(lat, lon):
+    # Link de Google Maps de un solo punto: las coordenadas se formatean directo a 6 decimales
+    # (un float32 de NumPy pasado por str/repr puede arrastrar dígitos de más)
+    return f"{URL_MAPS}{lat:.6f},{lon:.6f}"
 
 def generar_link_whatsapp(nombre, ubicacion, lat, lon):
-    map_url = f"https://www.google.com/maps/search/?api=1&query={lat},{lon}"
+    map_url = link_maps(lat, lon)
     texto = f"Vamos a tomar un cafe a {nombre}, queda en {ubicacion}: {map_url}"
     texto_codificado = urllib.parse.quote(texto)
     return f"https://api.whatsapp.com/send?text={texto_codificado}"
 
+def columna_whatsapp(df):
+    # Mismo link que generar_link_whatsapp, para todas las filas
+    texto = (
+        "Vamos a tomar un cafe a " + df["CAFE"].fillna("").astype(str) 
+        + ", queda en " + df["UBICACION"].fillna("").astype(str) 
+        + ": " + columna_maps(df)
+    )
+    return "https://api.whatsapp.com/send?text=" + texto.map(urllib.parse.quote)
+
+def con_links(df):
+    # Agrega las columnas MAPS y WHATSAPP que muestran todas las tablas de cafés (devuelve un DataFrame nuevo)
+    return df.assign(MAPS=columna_maps(df), WHATSAPP=columna_whatsapp(df))
+
+def mostrar_tabla_cafes(df, columnas):
+    # Tabla de cafés con los links como botones; la usan Cafés, Buscar y Favoritos
+    st.dataframe(
+        df[columnas], 
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            "INSTAGRAM": st.column_config.LinkColumn("Instagram", display_text="📱 Ver Perfil"),
+            "MAPS": st.column_config.LinkColumn("Google Maps", display_text="📍 Abrir en mapa"),
+            "WHATSAPP": st.column_config.LinkColumn("WhatsApp", display_text="💬 Invitar")
+        }
+    )
+
+def html_tarjeta_tostador(tostador, ciudad, instagram, tienda_online):
+    # Argumentos en el orden de COLUMNAS_TOSTADORES
+    link_tienda = str(tienda_online).strip()
+    if link_tienda != "-" and link_tienda.lower() != "nan" and link_tienda != "":
+        html_btn_tienda = f"<a class='ig-btn' href='{link_tienda}' target='_blank' style='margin-top: 10px; background-color: #BE8C63;'>🛒 Tienda Online</a>"
+    else:
+        html_btn_tienda = ""
+    
+    return (
+        f"<div class='tostador-card' style='text-align: center; padding: 25px 15px;'>"
+        f"<div>"
+        f"<h3 style='color: #4B3832; margin-bottom: 5px; font-size: 1.3rem;'>☕ {tostador}</h3>"
+        f"<p style='font-size: 1rem; color: #85746D; margin-top: 5px; font-weight: 600;'>📍 {ciudad}</p>"
+        f"</div>"
+        f"<div style='margin-top: 20px;'>"
+        f"<a class='ig-btn' href='{instagram}' target='_blank' style='margin-top: 0;'>📱 Ver Instagram</a>"
+        f"{html_btn_tienda}"
+        f"</div>"
+        f"</div>"
+    )
+
+def armar_mapa_busqueda(res_busqueda, lat_f, lon_f):
+    # Mapa multi-capa de una búsqueda por radio: cafés normales, TOP y la ubicación del usuario
+    view = pdk.ViewState(latitude=lat_f, longitude=lon_f, zoom=14)
+    
+    # Separamos las cafeterías en normales y tops para asignarles diseño diferente
+    es_top = res_busqueda["ES_TOP"].to_numpy(dtype=bool)
+    
+    capas_mapa = []
+    
+    # Capa 1: Cafeterías regulares
+    if not es_top.all():
+        capas_mapa.append(pdk.Layer(
+            "ScatterplotLayer", 
+            puntos_mapa(res_busqueda, ~es_top), 
+            get_position=["LONG", "LAT"],
+            get_color=[190, 130, 90, 220], 
+            get_radius=25, 
+            radius_min_pixels=3, 
+            pickable=True
+        ))
+    
+    # Capa 2: Cafeterías Top Sudamérica (Diferente color y tamaño)
+    if es_top.any():
+        capas_mapa.append(pdk.Layer(
+            "ScatterplotLayer", 
+            puntos_mapa(res_busqueda, es_top), 
+            get_position=["LONG", "LAT"],
+            get_color=[218, 165, 32, 255], # Color Dorado
+            get_radius=60,                 # Más grandes
+            radius_min_pixels=5, 
+            pickable=True
+        ))
+        
+    # Capa 3: Ubicación del usuario
+    capas_mapa.append(pdk.Layer(
+        "ScatterplotLayer",
+        [{"LAT": round(float(lat_f), 6), "LONG": round(float(lon_f), 6)}],
+        get_position=["LONG", "LAT"],
+        get_color=[30, 136, 229, 255],
+        get_radius=40,
+        radius_min_pixels=6,
+        pickable=False
+    ))
+    
+    return pdk.Deck(layers=capas_mapa, initial_view_state=view, tooltip={"text": "{CAFE}"})
+
 
 # ==========================================
 # 7. SIDEBAR - TELEGRAM
@@ -336,7 +756,7 @@ with st.sidebar:
 # ==========================================
 # 8. UI PRINCIPAL Y CONTADOR
 # ==========================================
-df_total = cargar_todos_los_cafes()
+df_total, huella_datos = cargar_todos_los_cafes()
 
 html_contador = (
     f"<div class='main-counter'>"
@@ -360,7 +780,7 @@ with tabs[0]:
     ciudad_sel = st.selectbox("🏙️ Ciudad de búsqueda", list(GID_CAFES.keys()))
     
     # Filtramos la ciudad seleccionada PERO agregamos también los TOP de Sudamérica/Argentina
-    df_ciudad = df_total[(df_total["CIUDAD"] == ciudad_sel) | (df_total["ES_TOP"] == True)].copy()
+    df_ciudad, lats_ciudad, lons_ciudad = indice_espacial(ciudad_sel, huella_datos, df_total)
     
     placeholders = {
         "Mar del Plata": "Ej: Av. Colón 1500",
@@ -409,89 +829,69 @@ with tabs[0]:
     if btn_buscar or btn_recomendar:
         lat_f, lon_f = None, None
         
-        if st.session_state.coords_memoria and direccion == st.session_state.dir_memoria:
+        # Firma de la búsqueda: si no cambió nada (ni los datos), reusamos la última
+        firma_busqueda = (ciudad_sel, huella_datos, direccion.strip().lower(), st.session_state.coords_memoria, radio_km)
+        busqueda_previa = st.session_state.get("ultima_busqueda")
+        repetir_busqueda = btn_buscar and busqueda_previa is not None and busqueda_previa["firma"] == firma_busqueda
+        
+        if repetir_busqueda:
+            lat_f, lon_f = busqueda_previa["coords"]
+        elif st.session_state.coords_memoria and direccion == st.session_state.dir_memoria:
             lat_f, lon_f = st.session_state.coords_memoria
         elif direccion:
-            lat_f, lon_f, _ = buscar_coordenadas_inteligente(direccion, ciudad_sel, df_ciudad)
+            # Memoria por sesión de direcciones ya resueltas: "Buscar" y "Recomendar" sobre la misma
+            # dirección no vuelven a pasar por el match local ni por el geocoder. Los fallos no se guardan
+            memoria_geo = st.session_state.setdefault("geo_memoria", {})
+            direccion_norm = normalizar_texto(direccion)
+            clave_geo = (direccion_norm, ciudad_sel)
+            if clave_geo not in memoria_geo:
+                lat_geo, lon_geo, _ = buscar_coordenadas_inteligente(direccion, ciudad_sel, df_ciudad, direccion_norm)
+                if lat_geo is not None:
+                    memoria_geo[clave_geo] = (lat_geo, lon_geo)
+            lat_f, lon_f = memoria_geo.get(clave_geo, (None, None))
 
         if lat_f:
-            df_ciudad["DIST_KM"] = df_ciudad.apply(lambda r: geodesic((lat_f, lon_f), (r["LAT"], r["LONG"])).km, axis=1)
-            
             if btn_buscar:
-                res_busqueda = df_ciudad[df_ciudad["DIST_KM"] <= radio_km].sort_values("DIST_KM")
+                if repetir_busqueda:
+                    res_busqueda = busqueda_previa["resultado"]
+                    total_en_radio = busqueda_previa["total"]
+                else:
+                    # Los más cercanos dentro del radio, ya ordenados por distancia
+                    posiciones, distancias, total_en_radio = cafes_en_radio(
+                        lats_ciudad, lons_ciudad, lat_f, lon_f, radio_km, limite=MAX_RESULTADOS
+                    )
+                    res_busqueda = df_ciudad.iloc[posiciones].assign(DIST_KM=distancias)
+                    
+                    if not res_busqueda.empty:
+                        res_busqueda = con_links(res_busqueda).reset_index(drop=True)
+                        res_busqueda["CUADRAS"] = columna_cuadras(res_busqueda["DIST_KM"].to_numpy(), ciudad_sel)
+                        
+                    st.session_state.ultima_busqueda = {
+                        "firma": firma_busqueda,
+                        "coords": (lat_f, lon_f),
+                        "resultado": res_busqueda,
+                        "total": total_en_radio
+                    }
                 
                 if not res_busqueda.empty:
-                    res_busqueda["CUADRAS"] = res_busqueda["DIST_KM"].apply(lambda km: calcular_cuadras(km, ciudad_sel))
-                    res_busqueda["MAPS"] = res_busqueda.apply(lambda r: f"https://www.google.com/maps/search/?api=1&query={r['LAT']},{r['LONG']}", axis=1)
-                    res_busqueda["WHATSAPP"] = res_busqueda.apply(lambda r: generar_link_whatsapp(r['CAFE'], r['UBICACION'], r['LAT'], r['LONG']), axis=1)
-                    res_busqueda = res_busqueda.reset_index(drop=True)
+                    if total_en_radio > MAX_RESULTADOS:
+                        st.caption(f"Mostrando los {MAX_RESULTADOS} locales más cercanos de {total_en_radio} en el radio.")
                     
-                    st.dataframe(
-                        res_busqueda[["CAFE", "UBICACION", "INSTAGRAM", "CUADRAS", "MAPS", "WHATSAPP"]], 
-                        use_container_width=True,
-                        hide_index=True,
-                        column_config={
-                            "INSTAGRAM": st.column_config.LinkColumn("Instagram", display_text="📱 Ver Perfil"),
-                            "MAPS": st.column_config.LinkColumn("Google Maps", display_text="📍 Abrir en mapa"),
-                            "WHATSAPP": st.column_config.LinkColumn("WhatsApp", display_text="💬 Invitar")
-                        }
-                    )
+                    mostrar_tabla_cafes(res_busqueda, ["CAFE", "UBICACION", "INSTAGRAM", "CUADRAS", "MAPS", "WHATSAPP"])
                     
                     # --- RENDERIZADO DEL MAPA MULTI-CAPA ---
-                    view = pdk.ViewState(latitude=lat_f, longitude=lon_f, zoom=14)
-                    
-                    # Separamos las cafeterías en normales y tops para asignarles diseño diferente
-                    res_normales = res_busqueda[res_busqueda["ES_TOP"] == False]
-                    res_tops = res_busqueda[res_busqueda["ES_TOP"] == True]
-                    
-                    capas_mapa = []
-                    
-                    # Capa 1: Cafeterías regulares
-                    if not res_normales.empty:
-                        capas_mapa.append(pdk.Layer(
-                            "ScatterplotLayer", 
-                            res_normales, 
-                            get_position=["LONG", "LAT"],
-                            get_color=[190, 130, 90, 220], 
-                            get_radius=25, 
-                            radius_min_pixels=3, 
-                            pickable=True
-                        ))
-                    
-                    # Capa 2: Cafeterías Top Sudamérica (Diferente color y tamaño)
-                    if not res_tops.empty:
-                        capas_mapa.append(pdk.Layer(
-                            "ScatterplotLayer", 
-                            res_tops, 
-                            get_position=["LONG", "LAT"],
-                            get_color=[218, 165, 32, 255], # Color Dorado
-                            get_radius=60,                 # Más grandes
-                            radius_min_pixels=5, 
-                            pickable=True
-                        ))
-                        
-                    # Capa 3: Ubicación del usuario
-                    capas_mapa.append(pdk.Layer(
-                        "ScatterplotLayer",
-                        pd.DataFrame([{"LAT": lat_f, "LONG": lon_f}]),
-                        get_position=["LONG", "LAT"],
-                        get_color=[30, 136, 229, 255],
-                        get_radius=40,
-                        radius_min_pixels=6,
-                        pickable=False
-                    ))
-                    
-                    st.pydeck_chart(pdk.Deck(layers=capas_mapa, initial_view_state=view, tooltip={"text": "{CAFE}"}))
+                    st.pydeck_chart(armar_mapa_busqueda(res_busqueda, lat_f, lon_f))
                 
                 else: 
                     st.warning("No encontramos locales en este radio. ¡Probá ampliando el rango o verificá el punto detectado!")
             
             elif btn_recomendar:
-                res_rec = df_ciudad[df_ciudad["DIST_KM"] <= 0.5]
+                posiciones, distancias = cafes_en_radio(lats_ciudad, lons_ciudad, lat_f, lon_f, RADIO_RECOMENDACION_KM)
+                res_rec = df_ciudad.iloc[posiciones].assign(DIST_KM=distancias)
                 if not res_rec.empty:
-                    elegido = res_rec.sample(1).iloc[0]
+                    elegido = res_rec.iloc[random.randrange(len(res_rec))]
                     dist_txt = calcular_cuadras(elegido['DIST_KM'], ciudad_sel)
-                    map_link = f"https://www.google.com/maps/search/?api=1&query={elegido['LAT']},{elegido['LONG']}"
+                    map_link = link_maps(elegido['LAT'], elegido['LONG'])
                     wpp_link = generar_link_whatsapp(elegido['CAFE'], elegido['UBICACION'], elegido['LAT'], elegido['LONG'])
                     ig_link = elegido.get('INSTAGRAM', '#')
                     
@@ -521,41 +921,12 @@ with tabs[1]:
     st.subheader("🔥 Tostadores de Especialidad")
     
     ciudad_tost = st.selectbox("🏙️ Filtrar tostadores por ciudad", ["Todas"] + list(GID_CAFES.keys()))
-    tostadores = cargar_tostadores()
-    
-    if "CIUDAD" not in tostadores.columns:
-        tostadores["CIUDAD"] = "-"
-    if "TIENDA ONLINE" not in tostadores.columns:
-        tostadores["TIENDA ONLINE"] = "-"
-    if "INSTAGRAM" not in tostadores.columns:
-        tostadores["INSTAGRAM"] = "#"
-        
-    if ciudad_tost != "Todas":
-        tostadores = tostadores[tostadores["CIUDAD"].str.contains(ciudad_tost, case=False, na=False)]
-    
-    for i in range(0, len(tostadores), 3):
-        cols = st.columns(3)
-        for j, (_, t) in enumerate(tostadores.iloc[i:i+3].iterrows()):
-            with cols[j]:
-                link_tienda = str(t.get('TIENDA ONLINE', '-')).strip()
-                if link_tienda != "-" and link_tienda.lower() != "nan" and link_tienda != "":
-                    html_btn_tienda = f"<a class='ig-btn' href='{link_tienda}' target='_blank' style='margin-top: 10px; background-color: #BE8C63;'>🛒 Tienda Online</a>"
-                else:
-                    html_btn_tienda = ""
-                
-                html_tostador = (
-                    f"<div class='tostador-card' style='text-align: center; padding: 25px 15px;'>"
-                    f"<div>"
-                    f"<h3 style='color: #4B3832; margin-bottom: 5px; font-size: 1.3rem;'>☕ {t.get('TOSTADOR', 'Desconocido')}</h3>"
-                    f"<p style='font-size: 1rem; color: #85746D; margin-top: 5px; font-weight: 600;'>📍 {t['CIUDAD']}</p>"
-                    f"</div>"
-                    f"<div style='margin-top: 20px;'>"
-                    f"<a class='ig-btn' href='{t['INSTAGRAM']}' target='_blank' style='margin-top: 0;'>📱 Ver Instagram</a>"
-                    f"{html_btn_tienda}"
-                    f"</div>"
-                    f"</div>"
-                )
-                st.markdown(html_tostador, unsafe_allow_html=True)
+    tostadores = tostadores_de_ciudad(ciudad_tost)
+    
+    # Todas las tarjetas en una sola grilla CSS
+    filas = tostadores[COLUMNAS_TOSTADORES].itertuples(index=False, name=None)
+    tarjetas = "".join(html_tarjeta_tostador(*fila) for fila in filas)
+    st.markdown(f"<div class='tostador-grid'>{tarjetas}</div>", unsafe_allow_html=True)
 
 
 # ------------------------------------------
@@ -564,50 +935,29 @@ with tabs[1]:
 with tabs[2]:
     st.subheader("🔍 Buscador inteligente")
     
-    total_cafeterias = len(df_total)
-    texto_todas = f"Todas ({total_cafeterias})"
-    
-    opciones_filtro_ciudad = [texto_todas]
-    mapa_filtro_ciudad = {texto_todas: "Todas"}
-    
-    for c in sorted(df_total["CIUDAD"].dropna().unique()):
-        cantidad = len(df_total[df_total["CIUDAD"] == c])
-        texto_opcion = f"{c} ({cantidad})"
-        opciones_filtro_ciudad.append(texto_opcion)
-        mapa_filtro_ciudad[texto_opcion] = c
-        
-    ciudad_filtro_sel = st.selectbox("🏙️ Filtrar lista por ciudad", opciones_filtro_ciudad)
+    opciones_ciudad, mapa_filtro_ciudad = opciones_filtro_ciudad(huella_datos, df_total)
+    ciudad_filtro_sel = st.selectbox("🏙️ Filtrar lista por ciudad", opciones_ciudad)
     ciudad_real_elegida = mapa_filtro_ciudad[ciudad_filtro_sel]
     
     if ciudad_real_elegida == "Todas":
         df_nombres_filtrado = df_total
     else:
-        df_nombres_filtrado = df_total[df_total["CIUDAD"] == ciudad_real_elegida]
+        posiciones_ciudad = indice_ciudades(huella_datos, df_total)
+        df_nombres_filtrado = df_total.iloc[posiciones_ciudad.get(ciudad_real_elegida, [])]
         
-    lista_nombres_filtrada = sorted(df_nombres_filtrado["CAFE"].dropna().unique())
+    lista_nombres_filtrada = sorted(nombre for nombre in df_nombres_filtrado["CAFE"].unique() if nombre)
     nombre_sel = st.selectbox("☕ Seleccioná o escribí el nombre del café", [""] + lista_nombres_filtrada)
     
     if nombre_sel:
-        resultado = df_nombres_filtrado[df_nombres_filtrado["CAFE"] == nombre_sel].copy()
-        resultado = resultado.reset_index(drop=True)
-        resultado["MAPS"] = resultado.apply(lambda r: f"https://www.google.com/maps/search/?api=1&query={r['LAT']},{r['LONG']}", axis=1)
-        resultado["WHATSAPP"] = resultado.apply(lambda r: generar_link_whatsapp(r['CAFE'], r['UBICACION'], r['LAT'], r['LONG']), axis=1)
+        resultado = df_nombres_filtrado[df_nombres_filtrado["CAFE"] == nombre_sel].reset_index(drop=True)
+        resultado = con_links(resultado)
         
         if len(resultado) > 1:
             st.success(f"Encontramos {len(resultado)} sucursales de **{nombre_sel}**")
         else:
             st.success(f"Encontrado en {resultado['CIUDAD'].iloc[0]}")
             
-        st.dataframe(
-            resultado[["CAFE", "UBICACION", "INSTAGRAM", "CIUDAD", "MAPS", "WHATSAPP"]], 
-            use_container_width=True,
-            hide_index=True,
-            column_config={
-                "INSTAGRAM": st.column_config.LinkColumn("Instagram", display_text="📱 Ver Perfil"),
-                "MAPS": st.column_config.LinkColumn("Google Maps", display_text="📍 Abrir en mapa"),
-                "WHATSAPP": st.column_config.LinkColumn("WhatsApp", display_text="💬 Invitar")
-            }
-        )
+        mostrar_tabla_cafes(resultado, ["CAFE", "UBICACION", "INSTAGRAM", "CIUDAD", "MAPS", "WHATSAPP"])
 
 
 # ------------------------------------------
@@ -617,16 +967,14 @@ with tabs[3]:
     st.subheader("🇦🇷 Mapa Federal")
     view_arg = pdk.ViewState(latitude=-38.41, longitude=-63.61, zoom=4)
     
-    # Separamos en dos DataFrames para aplicar estilos distintos en el mapa general
-    df_normales_fed = df_total[df_total["ES_TOP"] == False]
-    df_tops_fed = df_total[df_total["ES_TOP"] == True]
+    puntos_normales_fed, puntos_tops_fed = puntos_mapa_federal(huella_datos, df_total)
     
     capas_federales = []
     
-    if not df_normales_fed.empty:
+    if puntos_normales_fed:
         capas_federales.append(pdk.Layer(
             "ScatterplotLayer", 
-            df_normales_fed, 
+            puntos_normales_fed, 
             get_position=["LONG", "LAT"],
             get_color=[190, 140, 99, 180], 
             get_radius=30, 
@@ -634,10 +982,10 @@ with tabs[3]:
             pickable=True
         ))
         
-    if not df_tops_fed.empty:
+    if puntos_tops_fed:
         capas_federales.append(pdk.Layer(
             "ScatterplotLayer", 
-            df_tops_fed, 
+            puntos_tops_fed, 
             get_position=["LONG", "LAT"],
             get_color=[218, 165, 32, 255], # Dorado para destacar el Top
             get_radius=80,                 # Más grandes a nivel nacional
@@ -655,17 +1003,19 @@ with tabs[4]:
     st.subheader("⭐ Mis Cafés Favoritos")
     
     col_f1, col_f2 = st.columns(2)
-    ciudades_fav = ["Todas"] + sorted(df_total["CIUDAD"].dropna().unique())
+    ciudades_fav = ["Todas"] + ciudades_disponibles(huella_datos, df_total)
     ciudad_filtro_fav = col_f1.selectbox("🏙️ Filtrar por ciudad:", ciudades_fav, key="sel_fav_ciudad")
     busqueda_fav = col_f2.text_input("🔍 Buscar local específico:", key="txt_fav_busqueda")
     
-    df_fav_view = df_total.copy()
+    # Filtramos y después marcamos los favoritos
+    df_fav_view = df_total
     if ciudad_filtro_fav != "Todas":
-        df_fav_view = df_fav_view[df_fav_view["CIUDAD"] == ciudad_filtro_fav]
+        posiciones_ciudad = indice_ciudades(huella_datos, df_total)
+        df_fav_view = df_total.iloc[posiciones_ciudad.get(ciudad_filtro_fav, [])]
     if busqueda_fav:
         df_fav_view = df_fav_view[df_fav_view["CAFE"].str.contains(busqueda_fav, case=False, na=False)]
         
-    df_fav_view["ES_FAV"] = df_fav_view["CAFE"].isin(favs_iniciales)
+    df_fav_view = df_fav_view[["CAFE", "UBICACION", "CIUDAD"]].assign(ES_FAV=df_fav_view["CAFE"].isin(favs_iniciales))
     
     st.write("Tildá la casilla ⭐ en la tabla para guardarlo en tu lista:")
     
@@ -683,7 +1033,7 @@ with tabs[4]:
         key="editor_favs"
     )
     
-    cafes_visibles_fav = df_fav_view["CAFE"].tolist()
+    cafes_visibles_fav = set(df_fav_view["CAFE"].tolist())
     seleccionados_ahora_fav = edited_favs[edited_favs["ES_FAV"]]["CAFE"].tolist()
     
     favs_no_visibles = [c for c in favs_iniciales if c not in cafes_visibles_fav]
@@ -692,24 +1042,14 @@ with tabs[4]:
     if set(lista_favs_final) != set(favs_iniciales):
         cookie_manager.set("cafes_favoritos", "||".join(lista_favs_final))
         favs_iniciales = lista_favs_final
+        st.session_state.favoritos = lista_favs_final
         
     st.markdown("<br><hr>", unsafe_allow_html=True)
     
     if lista_favs_final:
         st.markdown("### 📋 Tu Lista Armada")
-        df_favs_mostrar = df_total[df_total["CAFE"].isin(lista_favs_final)].copy()
-        df_favs_mostrar["MAPS"] = df_favs_mostrar.apply(lambda r: f"https://www.google.com/maps/search/?api=1&query={r['LAT']},{r['LONG']}", axis=1)
-        df_favs_mostrar["WHATSAPP"] = df_favs_mostrar.apply(lambda r: generar_link_whatsapp(r['CAFE'], r['UBICACION'], r['LAT'], r['LONG']), axis=1)
-        
-        st.dataframe(
-            df_favs_mostrar[["CAFE", "UBICACION", "CIUDAD", "INSTAGRAM", "MAPS", "WHATSAPP"]],
-            use_container_width=True,
-            hide_index=True,
-            column_config={
-                "INSTAGRAM": st.column_config.LinkColumn("Instagram", display_text="📱 Ver Perfil"),
-                "MAPS": st.column_config.LinkColumn("Google Maps", display_text="📍 Abrir en mapa"),
-                "WHATSAPP": st.column_config.LinkColumn("WhatsApp", display_text="💬 Invitar")
-            }
-        )
+        df_favs_mostrar = con_links(df_total[df_total["CAFE"].isin(lista_favs_final)])
+        
+        mostrar_tabla_cafes(df_favs_mostrar, ["CAFE", "UBICACION", "CIUDAD", "INSTAGRAM", "MAPS", "WHATSAPP"])
     else:
         st.info("💡 Todavía no agregaste ningún favorito. Tildá alguno en la tabla de arriba.")